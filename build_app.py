@@ -12,7 +12,13 @@ import subprocess
 import sys
 import os
 import argparse
+import hashlib
+import io
+import pprint
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # 导入编码工具（如果存在）
@@ -35,107 +41,216 @@ except ImportError:
                 pass  # 使用默认编码
 
 
+# requirements.txt 中每行开头的包名
+# 支持格式：package, package==1.0, package>=1.0,<2.0
+_PKG_RE = re.compile(r'^[ \t]*([A-Za-z0-9_-]+)', re.MULTILINE)
+
+# PyInstaller spec 模板（Web版本使用 main.py 作为入口）
+SPEC_TEMPLATE = '''# -*- mode: python ; coding: utf-8 -*-
+# build-inputs-hash: {digest}
+# 由 build_app.py 自动生成，请勿手动修改
+import os
+
+from PyInstaller.utils.hooks import collect_data_files, collect_submodules
+
+# spec 文件位于 specs/ 目录，源码路径相对于项目根目录
+ROOT = os.path.dirname(SPECPATH)
+
+hiddenimports = {hidden_imports}
+for _pkg in {collect_submodules!r}:
+    hiddenimports += collect_submodules(_pkg)
+
+datas = [(os.path.join(ROOT, src), dst) for src, dst in {data_files}]
+datas += collect_data_files('fake_useragent')
+
+a = Analysis(
+    [os.path.join(ROOT, 'main.py')],
+    pathex=[],
+    binaries=[],
+    datas=datas,
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={{}},
+    runtime_hooks=[],
+    excludes=[],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name={name!r},
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console={console!r},
+)
+{bundle}'''
+
+# macOS 窗口模式下额外生成 .app 包（与 PyInstaller --onefile --windowed 一致）
+SPEC_BUNDLE_TEMPLATE = '''
+app = BUNDLE(
+    exe,
+    name={app_name!r},
+    icon=None,
+    bundle_identifier=None,
+)
+'''
+
+# spec 文件中记录输入哈希的行前缀
+SPEC_HASH_PREFIX = '# build-inputs-hash: '
+
+# requirements 解析结果的缓存模块（由 --freeze-requirements 生成）
+REQUIREMENTS_CACHE_FILE = 'requirements_cache.py'
+
+# 生成的 spec 文件存放目录
+SPECS_DIR = Path(__file__).parent / 'specs'
+
+# 构建失败时输出的 PyInstaller 日志末尾行数
+BUILD_LOG_TAIL_LINES = 50
+
+# 状态信息缓冲区，在关键节点统一写出，减少零碎的 stdout 写入
+_LOG = io.StringIO()
+
+
+def log(msg=''):
+    """将状态信息写入缓冲区"""
+    _LOG.write(msg)
+    _LOG.write('\n')
+
+
+def flush_log():
+    """将缓冲区中的状态信息一次性写到标准输出并清空"""
+    data = _LOG.getvalue()
+    if data:
+        sys.stdout.write(data)
+        sys.stdout.flush()
+        _LOG.seek(0)
+        _LOG.truncate()
+
+
+def _scan_requirements(req_path):
+    """用单次正则扫描从 requirements 文件中提取包名（去除版本约束）"""
+    # 注释行以 # 开头，不会被包名字符集匹配，空行同理
+    text = req_path.read_text(encoding='utf-8')
+    return tuple(_PKG_RE.findall(text))
+
+
+def _load_frozen_requirements(requirements_file, req_path):
+    """
+    读取 freeze_requirements 生成的缓存模块
+    
+    Returns:
+        tuple: 缓存的包名元组；缓存不存在、不匹配或已过期时返回 None
+    """
+    try:
+        from requirements_cache import _requirements_cache, _requirements_file, _mtime
+    except ImportError:
+        return None
+    
+    if _requirements_file != requirements_file:
+        return None
+    
+    try:
+        if _mtime < os.path.getmtime(req_path):
+            return None
+    except OSError:
+        return None
+    
+    return tuple(_requirements_cache)
+
+
+@lru_cache(maxsize=None)
 def parse_requirements(requirements_file='requirements.txt'):
     """
     解析 requirements.txt 文件，提取所有包名
+    优先使用 requirements_cache.py 中的冻结结果（不早于 requirements 文件的修改时间）
+    结果按进程缓存，同一文件只读取一次
     
     Args:
         requirements_file: requirements.txt 文件路径
         
     Returns:
-        list: 包名列表
+        tuple: 包名元组
     """
-    packages = []
     req_path = Path(__file__).parent / requirements_file
     
     if not req_path.exists():
+        return ()
+    
+    packages = _load_frozen_requirements(requirements_file, req_path)
+    if packages is not None:
         return packages
     
-    with open(req_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            # 跳过注释和空行
-            if not line or line.startswith('#'):
-                continue
-            
-            # 提取包名（去除版本约束）
-            # 支持格式：package, package==1.0, package>=1.0,<2.0
-            match = re.match(r'^([a-zA-Z0-9_-]+)', line)
-            if match:
-                packages.append(match.group(1))
+    return _scan_requirements(req_path)
+
+
+def freeze_requirements(requirements_file='requirements.txt'):
+    """
+    将 requirements 解析结果写入 requirements_cache.py，供后续构建直接导入
+    
+    Args:
+        requirements_file: requirements.txt 文件路径
+    
+    Returns:
+        bool: 是否写入成功
+    """
+    req_path = Path(__file__).parent / requirements_file
+    cache_path = Path(__file__).parent / REQUIREMENTS_CACHE_FILE
+    
+    try:
+        packages = _scan_requirements(req_path)
+        mtime = os.path.getmtime(req_path)
+    except OSError as e:
+        log(f"Failed to read {requirements_file}: {e}")
+        return False
     
-    return packages
+    content = (
+        "# -*- coding: utf-8 -*-\n"
+        "# 由 build_app.py --freeze-requirements 自动生成，请勿手动修改\n"
+        f"_requirements_file = {requirements_file!r}\n"
+        f"_mtime = {mtime!r}\n"
+        f"_requirements_cache = {packages!r}\n"
+    )
+    cache_path.write_text(content, encoding='utf-8')
+    
+    # 缓存模块已更新，清除进程内已加载的旧结果
+    sys.modules.pop(REQUIREMENTS_CACHE_FILE[:-3], None)
+    clear_build_cache()
+    
+    log(f"Frozen {len(packages)} packages from {requirements_file} into {REQUIREMENTS_CACHE_FILE}")
+    return True
 
 
-# 某些包需要显式导入子模块
+# 由 PyInstaller 的 collect_submodules 自动遍历全部子模块的包
+COLLECT_SUBMODULES_PACKAGES = (
+    'requests',
+    'urllib3',
+    'packaging',
+    'PIL',
+    'pillow_heif',
+)
+
+# 某些包需要显式导入子模块（无法或不需要整体遍历的包）
 PACKAGE_SUBMODULES = {
-    'requests': [
-        'requests.adapters',
-        'requests.auth',
-        'requests.cookies',
-        'requests.exceptions',
-        'requests.models',
-        'requests.sessions',
-        'requests.structures',
-        'requests.utils',
-        'requests.api',
-        'requests.compat',
-        'requests.help',
-        'requests.hooks',
-        'requests.packages',
-        'requests.status_codes',
-    ],
-    'urllib3': [
-        'urllib3.util',
-        'urllib3.util.retry',
-        'urllib3.util.ssl_',
-        'urllib3.util.timeout',
-        'urllib3.util.url',
-        'urllib3.connection',
-        'urllib3.connectionpool',
-        'urllib3.poolmanager',
-        'urllib3.response',
-        'urllib3.exceptions',
-        'urllib3._collections',
-    ],
-    'packaging': [
-        'packaging.version',
-        'packaging.specifiers',
-        'packaging.requirements',
-        'packaging.markers',
-        'packaging.utils',
-        'packaging.tags',
-    ],
-    'PIL': [
-        'PIL.Image',
-        'PIL.ImageTk',
-        'PIL.ImageDraw',
-        'PIL.ImageFile',
-        'PIL.ImageFont',
-        'PIL.ImageOps',
-        'PIL.JpegImagePlugin',
-        'PIL.PngImagePlugin',
-        'PIL.GifImagePlugin',
-        'PIL.BmpImagePlugin',
-        'PIL.WebPImagePlugin',
-        'PIL._imaging',
-    ],
-    'beautifulsoup4': [
+    'beautifulsoup4': (
         'bs4',
-    ],
-    'fake_useragent': [
+    ),
+    'fake_useragent': (
         'fake_useragent.data',
-    ],
-    'pillow_heif': [
-        'pillow_heif.heif',
-        'pillow_heif.misc',
-        'pillow_heif.options',
-    ],
+    ),
 }
 
 # 标准库模块（需要显式导入的）
 # 注意: tkinter 相关模块已移除，文件夹选择改为前端实现
-STDLIB_MODULES = [
+STDLIB_MODULES = (
     'threading',
     'json',
     'os',
@@ -156,7 +271,7 @@ STDLIB_MODULES = [
     'shutil',
     'subprocess',
     'datetime',
-]
+)
 
 # 包名映射（处理特殊情况）
 PACKAGE_NAME_MAPPING = {
@@ -165,41 +280,39 @@ PACKAGE_NAME_MAPPING = {
     'beautifulsoup4': 'bs4',
 }
 
+# 以小写包名为键的映射表，避免在循环中重复处理
+_LOWER_TO_CANONICAL = {k.lower(): v for k, v in PACKAGE_NAME_MAPPING.items()}
+
 # 隐式依赖（某些包的运行时依赖）
-IMPLICIT_DEPENDENCIES = [
+IMPLICIT_DEPENDENCIES = (
     'charset_normalizer',
     'idna',
     'certifi',
-]
+)
 
 
+@lru_cache(maxsize=None)
 def get_hidden_imports():
     """
     获取所有需要的 hiddenimports
+    结果按进程缓存；按首次出现的顺序去重，保证输出稳定（可用于构建缓存哈希）
     
     Returns:
-        list: 完整的 hiddenimports 列表
+        tuple: 完整的 hiddenimports 元组
     """
     packages = parse_requirements()
     hidden_imports = []
     
     # 添加基础包
     for pkg in packages:
-        pkg_lower = pkg.lower()
-        
-        # 处理特殊包名映射
-        if pkg_lower in PACKAGE_NAME_MAPPING:
-            mapped_pkg = PACKAGE_NAME_MAPPING[pkg_lower]
-            hidden_imports.append(mapped_pkg)
-            pkg = mapped_pkg
-        else:
-            # 将连字符转换为下划线
-            pkg = pkg.replace('-', '_')
-            hidden_imports.append(pkg)
+        # 处理特殊包名映射，否则将连字符转换为下划线
+        canonical = _LOWER_TO_CANONICAL.get(pkg.lower()) or pkg.replace('-', '_')
+        hidden_imports.append(canonical)
         
         # 添加已知的子模块
-        if pkg in PACKAGE_SUBMODULES:
-            hidden_imports.extend(PACKAGE_SUBMODULES[pkg])
+        submodules = PACKAGE_SUBMODULES.get(canonical)
+        if submodules:
+            hidden_imports.extend(submodules)
     
     # 添加标准库模块
     hidden_imports.extend(STDLIB_MODULES)
@@ -215,15 +328,22 @@ def get_hidden_imports():
         'novel_downloader',
     ])
 
-    # 去重并排序
-    hidden_imports = sorted(set(hidden_imports))
-    
-    return hidden_imports
+    # 去重并保持顺序
+    return tuple(dict.fromkeys(hidden_imports))
+
 
+def clear_build_cache():
+    """清除 requirements 解析、hiddenimports 和平台配置的缓存（requirements.txt 变更后调用）"""
+    get_platform_config.cache_clear()
+    get_hidden_imports.cache_clear()
+    parse_requirements.cache_clear()
 
+
+@lru_cache(maxsize=None)
 def get_platform_config(target_platform: str = None) -> dict:
     """
     获取目标平台的构建配置
+    结果按平台缓存，返回的字典在调用方之间共享，请勿修改
     
     Args:
         target_platform: 'windows', 'linux', 'darwin'，默认为当前平台
@@ -239,9 +359,10 @@ def get_platform_config(target_platform: str = None) -> dict:
         else:
             target_platform = 'linux'
     
+    extra_imports = []
+    
     config = {
         'platform': target_platform,
-        'hidden_imports': get_hidden_imports(),
         'data_files': [
             ('static', 'static'),
             ('templates', 'templates'),
@@ -251,40 +372,37 @@ def get_platform_config(target_platform: str = None) -> dict:
     
     # 平台特定配置
     if target_platform == 'windows':
-        config['hidden_imports'].extend([
+        extra_imports.extend([
             'win32api',
             'win32con',
             'pywintypes',
         ])
-        # Windows 使用分号作为路径分隔符
-        config['path_separator'] = ';'
     elif target_platform == 'linux':
-        config['hidden_imports'].extend([
+        extra_imports.extend([
             'gi',
             'gi.repository.Gtk',
         ])
-        config['path_separator'] = ':'
         # Linux 不需要 tkinter 相关的 Windows 模块
         config['exclude_modules'] = ['win32api', 'win32con', 'pywintypes']
     elif target_platform == 'darwin':
-        config['hidden_imports'].extend([
+        extra_imports.extend([
             'AppKit',
             'Foundation',
         ])
-        config['path_separator'] = ':'
     
     # 添加新的平台检测模块
-    config['hidden_imports'].extend([
+    extra_imports.extend([
         'platform_utils',
         'cli',
     ])
     
-    # 去重
-    config['hidden_imports'] = sorted(set(config['hidden_imports']))
+    # 合并基础模块与平台模块，去重并保持顺序
+    config['hidden_imports'] = list(dict.fromkeys(get_hidden_imports() + tuple(extra_imports)))
     
     return config
 
 
+@lru_cache(maxsize=None)
 def get_executable_name(base_name: str, platform: str, variant: str) -> str:
     """
     生成平台适配的可执行文件名
@@ -313,13 +431,106 @@ def get_executable_name(base_name: str, platform: str, variant: str) -> str:
     return name
 
 
-def build_executable(variant="release", executable_name=None, target_platform=None):
+def _spec_inputs_hash(variant, target_name, platform_config):
+    """计算生成 spec 文件所依赖输入的哈希值"""
+    payload = repr((
+        SPEC_TEMPLATE,
+        SPEC_BUNDLE_TEMPLATE,
+        platform_config['platform'],
+        variant,
+        target_name,
+        tuple(platform_config['hidden_imports']),
+        tuple(platform_config['data_files']),
+        COLLECT_SUBMODULES_PACKAGES,
+    ))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def write_spec_file(variant, target_name, platform_config):
+    """
+    生成 PyInstaller spec 文件（specs/<target_name>.spec）
+    spec 文件第二行记录输入哈希，输入未变化时直接复用已有的 spec 文件
+    
+    Args:
+        variant: 构建变体 ('release' 或 'debug')
+        target_name: 可执行文件名称（不包含扩展名）
+        platform_config: get_platform_config 返回的配置字典
+    
+    Returns:
+        Path: spec 文件路径
+    """
+    spec_path = SPECS_DIR / f"{target_name}.spec"
+    digest = _spec_inputs_hash(variant, target_name, platform_config)
+    
+    try:
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            f.readline()
+            hash_line = f.readline().strip()
+    except FileNotFoundError:
+        hash_line = ''
+    
+    cached_digest = hash_line[len(SPEC_HASH_PREFIX):] if hash_line.startswith(SPEC_HASH_PREFIX) else None
+    
+    if cached_digest == digest:
+        log(f"Reusing spec file: specs/{spec_path.name}")
+        return spec_path
+    
+    # 根据变体选择窗口模式或控制台模式
+    console = variant == "debug"
+    bundle = ''
+    if platform_config['platform'] == 'darwin' and not console:
+        bundle = SPEC_BUNDLE_TEMPLATE.format(app_name=f"{target_name}.app")
+    
+    content = SPEC_TEMPLATE.format(
+        digest=digest,
+        hidden_imports=pprint.pformat(list(platform_config['hidden_imports'])),
+        data_files=pprint.pformat(list(platform_config['data_files'])),
+        collect_submodules=COLLECT_SUBMODULES_PACKAGES,
+        name=target_name,
+        console=console,
+        bundle=bundle,
+    )
+    SPECS_DIR.mkdir(exist_ok=True)
+    spec_path.write_text(content, encoding='utf-8')
+    log(f"Generated spec file: specs/{spec_path.name}")
+    return spec_path
+
+
+def _build_inputs_hash(variant, target_name, platform_config):
+    """
+    计算构建输入的哈希值，用于跳过输入未变化的重复构建
+    
+    覆盖内容：spec 输入、项目根目录下所有 .py 源码，以及数据文件目录中各文件的修改时间和大小
+    """
+    root = Path(__file__).parent
+    h = hashlib.blake2b(digest_size=32)
+    h.update(_spec_inputs_hash(variant, target_name, platform_config).encode('utf-8'))
+    
+    for source in sorted(root.glob('*.py')):
+        h.update(source.name.encode('utf-8'))
+        h.update(source.read_bytes())
+    
+    for src, _dst in platform_config['data_files']:
+        for dirpath, dirnames, filenames in os.walk(root / src):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                st = os.stat(os.path.join(dirpath, filename))
+                rel = os.path.relpath(os.path.join(dirpath, filename), root)
+                h.update(f"{rel}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8'))
+    
+    return h.hexdigest()
+
+
+def build_executable(variant="release", executable_name=None, target_platform=None, force=False):
     """编译可执行文件
     
+    若构建输入与 dist/<target_name>.build.hash 记录一致且可执行文件存在，则跳过构建
+    
     Args:
         variant: 构建变体 ('release' 或 'debug')
         executable_name: 自定义可执行文件名称（不包含扩展名）
         target_platform: 目标平台 ('windows', 'linux', 'darwin')，默认为当前平台
+        force: 忽略构建缓存，强制重新构建
     
     Returns:
         tuple: (success, built_name, target_name)
@@ -331,7 +542,7 @@ def build_executable(variant="release", executable_name=None, target_platform=No
     platform_config = get_platform_config(target_platform)
     current_platform = platform_config['platform']
     
-    print(f"Starting build process for {variant} variant on {current_platform}...")
+    log(f"Starting build process for {variant} variant on {current_platform}...")
     
     # 确定目标可执行文件名称
     if executable_name:
@@ -339,50 +550,82 @@ def build_executable(variant="release", executable_name=None, target_platform=No
     else:
         target_name = get_executable_name("FXdownloader", current_platform, variant)
     
+    # 输入未变化时跳过构建
+    ext = ".exe" if os.name == "nt" else ""
+    build_hash = _build_inputs_hash(variant, target_name, platform_config)
+    hash_path = Path("dist") / f"{target_name}.build.hash"
+    if not force:
+        try:
+            cached_hash = hash_path.read_text(encoding='utf-8').strip()
+        except FileNotFoundError:
+            cached_hash = None
+        if cached_hash == build_hash and (Path("dist") / f"{target_name}{ext}").exists():
+            log(f"Build inputs unchanged, skipping build: {target_name}{ext}")
+            flush_log()
+            return True, target_name, target_name
+    
     # Web版本使用 main.py 作为入口
-    print("Building Web version with main.py as entry point")
+    log("Building Web version with main.py as entry point")
+    
+    # 生成（或复用）spec 文件，隐藏导入和数据文件都写在 spec 中，避免超长命令行
+    spec_path = write_spec_file(variant, target_name, platform_config)
     
-    # 构建基础命令
     cmd = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",
-        f"--name={target_name}",
+        "--noconfirm",
+        str(spec_path),
     ]
     
-    # 根据变体选择窗口模式或控制台模式
-    if variant == "debug":
-        cmd.append("--console")
-    else:
-        cmd.append("--windowed")
-    
-    # 添加隐藏导入（使用平台配置）
-    for import_name in platform_config['hidden_imports']:
-        cmd.extend(["--hidden-import", import_name])
-    
-    # 添加数据收集
-    cmd.extend(["--collect-data", "fake_useragent"])
-    cmd.extend(["--collect-submodules", "PIL"])
-    
-    # 添加静态文件和模板（使用平台适配的路径分隔符）
-    sep = platform_config['path_separator']
-    for src, dst in platform_config['data_files']:
-        cmd.extend(["--add-data", f"{src}{sep}{dst}"])
-    
-    # 添加入口文件（Web版）
-    cmd.append("main.py")
-    
     # built_name和target_name相同
     built_name = target_name
     
+    # debug 变体流式输出完整的 PyInstaller 日志；release 变体丢弃 stdout，
+    # 只读取 stderr 保留末尾若干行用于失败报告
+    verbose = variant == "debug"
+    tail = deque(maxlen=BUILD_LOG_TAIL_LINES)
+    # 启动 PyInstaller 前先写出已缓冲的状态信息，保证输出顺序
+    flush_log()
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True, encoding='utf-8')
-        print("Build successful")
-        print(result.stdout)
-        return True, target_name, target_name
-    except subprocess.CalledProcessError as e:
-        print("Build failed")
-        print(f"Error output: {e.stderr}")
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE if verbose else subprocess.DEVNULL,
+            stderr=subprocess.STDOUT if verbose else subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+    except OSError as e:
+        log("Build failed")
+        log(f"Error output: {e}")
+        flush_log()
         return False, target_name, target_name
+    
+    with proc:
+        stream = proc.stdout if verbose else proc.stderr
+        for line in stream:
+            if verbose:
+                print(line, end='')
+            else:
+                tail.append(line)
+        returncode = proc.wait()
+    
+    if returncode == 0:
+        log("Build successful")
+        try:
+            hash_path.write_text(build_hash, encoding='utf-8')
+        except OSError as e:
+            log(f"Failed to write build hash: {e}")
+        flush_log()
+        return True, target_name, target_name
+    
+    log("Build failed")
+    # debug 变体的输出已经逐行打印过，不再重复
+    if not verbose:
+        log(f"Error output (last {len(tail)} lines):")
+        _LOG.write(''.join(tail))
+    flush_log()
+    return False, target_name, target_name
 
 def check_output(expected_name):
     """检查编译输出
@@ -390,25 +633,29 @@ def check_output(expected_name):
     Args:
         expected_name: 期望的可执行文件名称（不包含扩展名）
     """
-    print("Checking build output...")
-    if os.path.exists("dist"):
-        files = os.listdir("dist")
-        print(f"dist directory contents: {files}")
-        
-        # 检查可执行文件
-        exe_name = f"{expected_name}.exe" if os.name == "nt" else expected_name
-        exe_path = os.path.join("dist", exe_name)
-        
-        if os.path.exists(exe_path):
-            size = os.path.getsize(exe_path)
-            print(f"Executable created successfully: {exe_name} ({size} bytes)")
-            return True
-        else:
-            print(f"Executable not found: {exe_path}")
-            return False
+    log("Checking build output...")
+    dist = Path("dist")
+    exe = dist / (f"{expected_name}.exe" if os.name == "nt" else expected_name)
+    
+    # 成功路径只需一次 stat
+    try:
+        size = exe.stat().st_size
+    except FileNotFoundError:
+        pass
     else:
-        print("dist directory does not exist")
+        log(f"Executable created successfully: {exe.name} ({size} bytes)")
+        return True
+    
+    # 未找到时列出 dist 目录内容便于排查
+    try:
+        with os.scandir(dist) as it:
+            log(f"dist directory contents: {[entry.name for entry in it]}")
+    except FileNotFoundError:
+        log("dist directory does not exist")
         return False
+    
+    log(f"Executable not found: {exe}")
+    return False
 
 def rename_executable(current_name, target_name):
     """重命名可执行文件
@@ -421,54 +668,94 @@ def rename_executable(current_name, target_name):
         return True
         
     ext = ".exe" if os.name == "nt" else ""
-    current_path = os.path.join("dist", f"{current_name}{ext}")
-    target_path = os.path.join("dist", f"{target_name}{ext}")
+    current_path = Path("dist") / f"{current_name}{ext}"
+    target_path = Path("dist") / f"{target_name}{ext}"
     
-    if os.path.exists(current_path):
-        try:
-            os.rename(current_path, target_path)
-            print(f"Renamed {current_name}{ext} to {target_name}{ext}")
-            return True
-        except OSError as e:
-            print(f"Failed to rename executable: {e}")
-            return False
-    else:
-        print(f"Source file not found: {current_path}")
+    # Path.replace 在各平台上都会覆盖已有目标文件，无需预先检查源文件
+    try:
+        current_path.replace(target_path)
+    except FileNotFoundError:
+        log(f"Source file not found: {current_path}")
+        return False
+    except OSError as e:
+        log(f"Failed to rename executable: {e}")
         return False
-
-def main():
-    """主函数"""
-    parser = argparse.ArgumentParser(description="Build Tomato Novel Downloader")
-    parser.add_argument("--variant", choices=["release", "debug"], default="release",
-                       help="Build variant (release or debug)")
-    parser.add_argument("--name", type=str, help="Custom executable name (without extension)")
-    
-    args = parser.parse_args()
     
-    # 构建可执行文件
-    success, built_name, target_name = build_executable(args.variant, args.name)
+    log(f"Renamed {current_name}{ext} to {target_name}{ext}")
+    return True
+
+def finish_build(success, built_name, target_name):
+    """检查构建输出并按需重命名
     
+    Args:
+        success: 构建是否成功
+        built_name: 构建生成的可执行文件名称（不包含扩展名）
+        target_name: 期望的最终名称（不包含扩展名）
+    """
     if success:
         # 先检查构建输出
         if check_output(built_name):
             # 如果built_name和target_name不同，需要重命名
             if built_name != target_name:
                 if rename_executable(built_name, target_name):
-                    print(f"Build completed successfully! Final executable: {target_name}")
+                    log(f"Build completed successfully! Final executable: {target_name}")
                     return True
                 else:
-                    print("Build successful but renaming failed")
+                    log("Build successful but renaming failed")
+                    flush_log()
                     return False
             else:
-                print(f"Build completed successfully! Executable: {built_name}")
+                log(f"Build completed successfully! Executable: {built_name}")
                 return True
         else:
-            print("Build output check failed")
+            log("Build output check failed")
+            flush_log()
             return False
     else:
-        print("Build failed")
+        log("Build failed")
+        flush_log()
         return False
 
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Build Tomato Novel Downloader")
+    parser.add_argument("--variant", choices=["release", "debug"], default="release",
+                       help="Build variant (release or debug)")
+    parser.add_argument("--variants", choices=["release", "debug"], nargs="+",
+                       help="Build several variants in parallel (overrides --variant)")
+    parser.add_argument("--name", type=str, help="Custom executable name (without extension)")
+    parser.add_argument("--force", action="store_true",
+                       help="Rebuild even if build inputs are unchanged")
+    parser.add_argument("--freeze-requirements", action="store_true",
+                       help="Write the parsed requirements.txt to requirements_cache.py and exit")
+    
+    args = parser.parse_args()
+    
+    if args.freeze_requirements:
+        success = freeze_requirements()
+        flush_log()
+        return success
+    
+    variants = list(dict.fromkeys(args.variants)) if args.variants else [args.variant]
+    if len(variants) > 1 and args.name:
+        parser.error("--name cannot be used when building multiple variants")
+    
+    # 构建可执行文件
+    if len(variants) == 1:
+        results = [build_executable(variants[0], args.name, force=args.force)]
+    else:
+        # 各变体输出到独立的 dist/<name>，可以并行构建
+        with ProcessPoolExecutor(max_workers=len(variants)) as executor:
+            futures = [
+                executor.submit(build_executable, variant, None, None, args.force)
+                for variant in variants
+            ]
+            results = [future.result() for future in futures]
+    
+    success = all([finish_build(*result) for result in results])
+    flush_log()
+    return success
+
 if __name__ == "__main__":
     success = main()
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -6,16 +6,28 @@
 
 import sys
 import os
-import requests
-import re
-from packaging import version as pkg_version
+import json
+import logging
+import shutil
+import stat
+import string
+import subprocess
+import time
+import tempfile
+from functools import lru_cache
 from typing import Optional, Dict, Tuple, List
 from locales import t
 
+logger = logging.getLogger(__name__)
 
+# 更新说明中需要移除的 markdown 标记字符
+_MD_STRIP = str.maketrans('', '', '#*`')
+
+
+@lru_cache(maxsize=1)
 def get_current_platform() -> str:
     """
-    获取当前平台标识符用于更新过滤
+    获取当前平台标识符用于更新过滤（进程内不会变化，结果缓存）
     
     Returns:
         平台标识符: 'windows', 'linux', 'macos', 'termux', 'unknown'
@@ -34,19 +46,194 @@ def get_current_platform() -> str:
     else:
         return 'unknown'
 
-def parse_version(ver_str: str) -> Optional[pkg_version.Version]:
-    """解析版本号字符串"""
+def parse_version(ver_str: str) -> Optional[Tuple[int, ...]]:
+    """
+    解析版本号字符串为整数元组，如 'v1.2.3' -> (1, 2, 3)
+    忽略预发布/构建后缀（'-beta'、'+build'），末尾的 0 会被去除，使 1.2 与 1.2.0 相等
+    """
+    try:
+        # 移除前导的 'v' 字符和后缀
+        core = ver_str.strip().lstrip('vV').split('+')[0].split('-')[0]
+        parts = [int(x) for x in core.split('.')]
+    except (AttributeError, ValueError):
+        return None
+    
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+# 复用的 HTTP 会话（保持连接池，避免每次检查都重新进行 TCP/TLS 握手）
+_SESSION = None
+
+def _get_session():
+    """获取模块级共享的 requests 会话（首次联网时才导入 requests）"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        session.headers.update({
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'FXdownloader-updater'
+        })
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry))
+        _SESSION = session
+    return _SESSION
+
+def _release_cache_dir() -> str:
+    """获取当前用户私有的缓存目录（不使用共享的临时目录，避免被其他用户篡改）"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'fxdownloader')
+
+def _release_cache_path(repo: str) -> str:
+    """获取 release 信息缓存文件路径"""
+    return os.path.join(_release_cache_dir(), f'release_{repo.replace("/", "_")}.json')
+
+def _load_release_cache(repo: str) -> Optional[Dict]:
+    """读取 release 信息缓存，不存在、损坏或不属于当前用户时返回None"""
+    try:
+        with open(_release_cache_path(repo), 'r', encoding='utf-8') as f:
+            # POSIX 上拒绝其他用户创建的文件（缓存内容决定下载地址）
+            if hasattr(os, 'getuid') and os.fstat(f.fileno()).st_uid != os.getuid():
+                return None
+            cache = json.load(f)
+        if isinstance(cache, dict) and isinstance(cache.get('body'), dict):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _save_release_cache(repo: str, etag: str, last_modified: str, body: Dict) -> None:
+    """写入 release 信息缓存（先写临时文件再替换，避免并发写入产生半截文件；失败时忽略）"""
+    cache = {
+        'etag': etag,
+        'last_modified': last_modified,
+        'body': body,
+        'fetched_at': time.time()
+    }
+    path = _release_cache_path(repo)
+    try:
+        cache_dir = os.path.dirname(path)
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.release_', suffix='.tmp', dir=cache_dir)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def _conditional_headers(cache: Optional[Dict]) -> Dict[str, str]:
+    """根据缓存生成条件请求头"""
+    headers = {}
+    if cache:
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+    return headers
+
+# release 信息中实际使用的字段
+_RELEASE_FIELDS = frozenset(('tag_name', 'name', 'body', 'html_url', 'published_at', 'assets'))
+
+def _read_release_json(response) -> Dict:
+    """
+    读取 release 接口的响应（需以 stream=True 发起请求）
+    安装了 ijson 时流式解析，只保留需要的顶层字段，降低内存占用；否则回退到 response.json()
+    """
+    try:
+        import ijson
+    except ImportError:
+        return response.json()
+    
+    # 由 urllib3 处理 gzip 等内容编码
+    response.raw.decode_content = True
+    # use_float: 非整数按 float 返回（默认的 Decimal 无法被 json.dump 写入缓存）
+    items = ijson.kvitems(response.raw, '', use_float=True)
+    return {key: value for key, value in items if key in _RELEASE_FIELDS}
+
+def _extract_release_info(data: Dict) -> Dict:
+    """从 GitHub API 返回的数据中提取需要的字段"""
+    return {
+        'tag_name': data.get('tag_name', ''),
+        'name': data.get('name', ''),
+        'body': data.get('body', ''),
+        'html_url': data.get('html_url', ''),
+        'published_at': data.get('published_at', ''),
+        'assets': data.get('assets', [])
+    }
+
+# GraphQL 查询：一次请求只取需要的字段（需要 GitHub token）
+_GRAPHQL_URL = 'https://api.github.com/graphql'
+_GRAPHQL_QUERY = (
+    'query($o:String!,$r:String!){repository(owner:$o,name:$r){latestRelease{'
+    'tagName name url publishedAt description '
+    'releaseAssets(first:20){nodes{name downloadUrl size}}}}}'
+)
+
+def _get_latest_release_graphql(repo: str, token: str, timeout: int = 10) -> Optional[Dict]:
+    """
+    通过 GitHub GraphQL API 获取最新发布版本，返回与 REST 接口相同结构的字典
+    
+    Args:
+        repo: GitHub仓库名，格式: owner/repo
+        token: GitHub 访问令牌
+        timeout: 请求超时时间(秒)
+    
+    Returns:
+        包含版本信息的字典，如果失败返回None
+    """
     try:
-        # 移除前导的 'v' 字符
-        ver_str = ver_str.lstrip('v')
-        # 尝试解析为标准版本号
-        return pkg_version.parse(ver_str)
+        owner, name = repo.split('/', 1)
+        response = _get_session().post(
+            _GRAPHQL_URL,
+            json={'query': _GRAPHQL_QUERY, 'variables': {'o': owner, 'r': name}},
+            headers={'Authorization': f'bearer {token}'},
+            timeout=timeout
+        )
+        if response.status_code != 200:
+            return None
+        
+        data = response.json().get('data') or {}
+        release = (data.get('repository') or {}).get('latestRelease')
+        if not release:
+            return None
+        
+        nodes = (release.get('releaseAssets') or {}).get('nodes') or []
+        return {
+            'tag_name': release.get('tagName', ''),
+            'name': release.get('name', ''),
+            'body': release.get('description', ''),
+            'html_url': release.get('url', ''),
+            'published_at': release.get('publishedAt', ''),
+            'assets': [
+                {
+                    'name': node.get('name', ''),
+                    'size': node.get('size', 0),
+                    'browser_download_url': node.get('downloadUrl', '')
+                }
+                for node in nodes
+            ]
+        }
     except Exception:
         return None
 
 def get_latest_release(repo: str, timeout: int = 10) -> Optional[Dict]:
     """
     获取GitHub仓库的最新发布版本
+    设置了 GITHUB_TOKEN 环境变量时优先使用 GraphQL 接口（响应更小）；
+    否则使用 REST 接口的 ETag/Last-Modified 条件请求，未变化时 GitHub 返回 304 且不计入速率限制
     
     Args:
         repo: GitHub仓库名，格式: owner/repo
@@ -55,32 +242,157 @@ def get_latest_release(repo: str, timeout: int = 10) -> Optional[Dict]:
     Returns:
         包含版本信息的字典，如果失败返回None
     """
+    token = os.environ.get('GITHUB_TOKEN')
+    if token:
+        result = _get_latest_release_graphql(repo, token, timeout)
+        if result:
+            return result
+    
     try:
         url = f'https://api.github.com/repos/{repo}/releases/latest'
+        cache = _load_release_cache(repo)
+        headers = _conditional_headers(cache)
+        
+        with _get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and cache:
+                return cache['body']
+            
+            if response.status_code == 200:
+                result = _extract_release_info(_read_release_json(response))
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+                if etag or last_modified:
+                    _save_release_cache(repo, etag, last_modified, result)
+                return result
+        return None
+    except Exception:
+        return None
+
+async def _get_latest_release_async(repo: str, session, timeout: int = 10) -> Optional[Dict]:
+    """
+    get_latest_release 的异步版本（基于 aiohttp）
+    
+    Args:
+        repo: GitHub仓库名，格式: owner/repo
+        session: aiohttp.ClientSession
+        timeout: 请求超时时间(秒)
+    
+    Returns:
+        包含版本信息的字典，如果失败返回None
+    """
+    import aiohttp
+    
+    try:
+        url = f'https://api.github.com/repos/{repo}/releases/latest'
+        cache = _load_release_cache(repo)
         headers = {
             'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'Mozilla/5.0'
+            'User-Agent': 'FXdownloader-updater'
         }
+        headers.update(_conditional_headers(cache))
         
-        response = requests.get(url, headers=headers, timeout=timeout)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                'tag_name': data.get('tag_name', ''),
-                'name': data.get('name', ''),
-                'body': data.get('body', ''),
-                'html_url': data.get('html_url', ''),
-                'published_at': data.get('published_at', ''),
-                'assets': data.get('assets', [])
-            }
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 304 and cache:
+                return cache['body']
+            
+            if response.status == 200:
+                result = _extract_release_info(await response.json())
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+                if etag or last_modified:
+                    _save_release_cache(repo, etag, last_modified, result)
+                return result
         return None
     except Exception:
         return None
 
+async def _head_content_length(session, url: str, timeout: int = 10) -> Optional[int]:
+    """发送 HEAD 请求获取下载文件大小，失败时返回None"""
+    import aiohttp
+    
+    async with session.head(url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if response.status == 200 and response.content_length is not None:
+            return response.content_length
+    return None
+
+async def get_latest_release_with_assets_async(repo: str, timeout: int = 10) -> Optional[Dict]:
+    """
+    获取最新发布版本，并并发查询各 asset 的实际下载大小
+    
+    Args:
+        repo: GitHub仓库名，格式: owner/repo
+        timeout: 单个请求超时时间(秒)
+    
+    Returns:
+        包含版本信息的字典（assets 中的 size 已按 Content-Length 更新），如果失败返回None
+    """
+    import asyncio
+    import aiohttp
+    
+    try:
+        connector = aiohttp.TCPConnector(limit=5)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            latest = await _get_latest_release_async(repo, session, timeout)
+            if not latest:
+                return None
+            
+            # 缺少下载链接的 asset 会在 gather 中以异常返回，保留原始大小
+            assets = latest.get('assets', [])
+            sizes = await asyncio.gather(
+                *(_head_content_length(session, a.get('browser_download_url', ''), timeout) for a in assets),
+                return_exceptions=True
+            )
+        
+        merged = [
+            dict(asset, size=size) if isinstance(size, int) else asset
+            for asset, size in zip(assets, sizes)
+        ]
+        
+        return dict(latest, assets=merged)
+    except Exception:
+        return None
+
+# check_update 结果的内存缓存，短时间内的重复检查直接返回
+_UPDATE_CACHE: Dict[Tuple[str, str], Tuple[float, Tuple[bool, Dict]]] = {}
+_UPDATE_TTL = 600  # 秒
+
+def _get_cached_update(current_version: str, repo: str) -> Optional[Tuple[bool, Dict]]:
+    """读取未过期的检查结果"""
+    cached = _UPDATE_CACHE.get((current_version, repo))
+    if cached and time.monotonic() - cached[0] < _UPDATE_TTL:
+        return cached[1]
+    return None
+
+def _store_cached_update(current_version: str, repo: str, result: Optional[Tuple[bool, Dict]]) -> None:
+    """缓存成功的检查结果"""
+    if result is not None:
+        _UPDATE_CACHE[(current_version, repo)] = (time.monotonic(), result)
+
+def _evaluate_update(current_version: str, latest: Optional[Dict]) -> Optional[Tuple[bool, Dict]]:
+    """比较当前版本与最新版本，返回 (是否有新版本, 最新版本信息) 或 None"""
+    if not latest:
+        return None
+    
+    latest_version_str = latest.get('tag_name', '')
+    if not latest_version_str:
+        return None
+    
+    # 解析版本号
+    current_ver = parse_version(current_version)
+    latest_ver = parse_version(latest_version_str)
+    
+    if not current_ver or not latest_ver:
+        return None
+    
+    # 比较版本号
+    has_update = latest_ver > current_ver
+    
+    return (has_update, latest)
+
 def check_update(current_version: str, repo: str) -> Optional[Tuple[bool, Dict]]:
     """
     检查是否有新版本可用
+    成功的结果会在内存中缓存 _UPDATE_TTL 秒
     
     Args:
         current_version: 当前版本号
@@ -89,29 +401,78 @@ def check_update(current_version: str, repo: str) -> Optional[Tuple[bool, Dict]]
     Returns:
         (是否有新版本, 最新版本信息) 或 None(检查失败)
     """
+    cached = _get_cached_update(current_version, repo)
+    if cached is not None:
+        return cached
+    
     try:
-        latest = get_latest_release(repo)
-        if not latest:
-            return None
-        
-        latest_version_str = latest.get('tag_name', '')
-        if not latest_version_str:
-            return None
-        
-        # 解析版本号
-        current_ver = parse_version(current_version)
-        latest_ver = parse_version(latest_version_str)
-        
-        if not current_ver or not latest_ver:
-            return None
-        
-        # 比较版本号
-        has_update = latest_ver > current_ver
-        
-        return (has_update, latest)
+        result = _evaluate_update(current_version, get_latest_release(repo))
+    except Exception:
+        return None
     
+    _store_cached_update(current_version, repo, result)
+    return result
+
+async def check_update_async(current_version: str, repo: str, session=None) -> Optional[Tuple[bool, Dict]]:
+    """
+    check_update 的异步版本，等待网络请求期间不阻塞事件循环
+    
+    Args:
+        current_version: 当前版本号
+        repo: GitHub仓库名
+        session: 可选的 aiohttp.ClientSession，为 None 时临时创建
+    
+    Returns:
+        (是否有新版本, 最新版本信息) 或 None(检查失败)
+    """
+    import aiohttp
+    
+    cached = _get_cached_update(current_version, repo)
+    if cached is not None:
+        return cached
+    
+    try:
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                latest = await _get_latest_release_async(repo, own_session)
+        else:
+            latest = await _get_latest_release_async(repo, session)
+        result = _evaluate_update(current_version, latest)
     except Exception:
         return None
+    
+    _store_cached_update(current_version, repo, result)
+    return result
+
+def _is_windows_asset(name: str, name_lower: str) -> bool:
+    return name.endswith('.exe')
+
+def _is_linux_asset(name: str, name_lower: str) -> bool:
+    return 'linux' in name_lower and not name.endswith('.exe')
+
+def _is_macos_asset(name: str, name_lower: str) -> bool:
+    return 'macos' in name_lower and not name.endswith('.exe')
+
+def _classify_windows(name: str, name_lower: str) -> Tuple[str, str, bool]:
+    """分类 Windows 版本，返回 (版本类型, 描述翻译键, 是否推荐)"""
+    if 'Standalone' in name:
+        return 'standalone', 'up_desc_standalone', True
+    if 'debug' in name_lower:
+        return 'debug', 'up_desc_debug', False
+    return 'standard', 'up_desc_standard', False
+
+def _classify_unix(name: str, name_lower: str) -> Tuple[str, str, bool]:
+    """分类 Linux/macOS 版本，返回 (版本类型, 描述翻译键, 是否推荐)"""
+    if 'debug' in name_lower:
+        return 'debug', 'up_desc_linux_debug', False
+    return 'release', 'up_desc_linux_release', True
+
+# 平台 -> (asset 过滤函数, 分类函数)
+_PLATFORM_HANDLERS = {
+    'windows': (_is_windows_asset, _classify_windows),
+    'linux': (_is_linux_asset, _classify_unix),
+    'macos': (_is_macos_asset, _classify_unix),
+}
 
 def parse_release_assets(latest_info: Dict, platform: str = 'windows') -> list:
     """
@@ -134,71 +495,47 @@ def parse_release_assets(latest_info: Dict, platform: str = 'windows') -> list:
     assets = latest_info.get('assets', [])
     parsed_assets = []
     
-    print(f'[DEBUG] parse_release_assets: platform={platform}, total_assets={len(assets)}')
+    logger.debug('parse_release_assets: platform=%s, total_assets=%d', platform, len(assets))
+    
+    # 平台判断在循环外完成一次
+    handler = _PLATFORM_HANDLERS.get(platform)
+    if handler is None:
+        return parsed_assets
+    is_platform_asset, classify = handler
     
     for asset in assets:
         name = asset.get('name', '')
+        name_lower = name.lower()
         size = asset.get('size', 0)
         download_url = asset.get('browser_download_url', '')
         
-        print(f'[DEBUG] Checking asset: name={name}, size={size}')
+        logger.debug('Checking asset: name=%s, size=%s', name, size)
         
         # 只处理指定平台的文件
-        if platform == 'windows':
-            if not name.endswith('.exe'):
-                print(f'[DEBUG]   -> Skipped: not .exe')
-                continue
-            
-            # 分类 Windows 版本
-            if 'Standalone' in name:
-                asset_type = 'standalone'
-                description = t("up_desc_standalone")
-                recommended = True
-                print(f'[DEBUG]   -> Matched: standalone')
-            elif 'debug' in name.lower():
-                asset_type = 'debug'
-                description = t("up_desc_debug")
-                recommended = False
-                print(f'[DEBUG]   -> Matched: debug')
-            else:
-                asset_type = 'standard'
-                description = t("up_desc_standard")
-                recommended = False
-                print(f'[DEBUG]   -> Matched: standard')
-        
-        elif platform == 'linux':
-            if not ('linux' in name.lower() and not name.endswith('.exe')):
-                continue
-            asset_type = 'debug' if 'debug' in name.lower() else 'release'
-            description = t("up_desc_linux_debug") if asset_type == 'debug' else t("up_desc_linux_release")
-            recommended = asset_type == 'release'
-        
-        elif platform == 'macos':
-            if not ('macos' in name.lower() and not name.endswith('.exe')):
-                continue
-            asset_type = 'debug' if 'debug' in name.lower() else 'release'
-            description = t("up_desc_linux_debug") if asset_type == 'debug' else t("up_desc_linux_release")
-            recommended = asset_type == 'release'
-        
-        else:
+        if not is_platform_asset(name, name_lower):
+            logger.debug('  -> Skipped: not a %s asset', platform)
             continue
         
+        asset_type, description_key, recommended = classify(name, name_lower)
+        logger.debug('  -> Matched: %s', asset_type)
+        
         parsed_assets.append({
             'name': name,
             'type': asset_type,
             'size': size,
             'size_mb': f'{size / 1024 / 1024:.1f}',
             'download_url': download_url,
-            'description': description,
+            'description': t(description_key),
             'recommended': recommended
         })
     
     # 排序: 推荐的排在前面,然后按类型排序
     parsed_assets.sort(key=lambda x: (not x['recommended'], x['type']))
     
-    print(f'[DEBUG] Final parsed_assets count: {len(parsed_assets)}')
-    for i, a in enumerate(parsed_assets):
-        print(f'[DEBUG]   [{i}] {a["name"]} -> type={a["type"]}, recommended={a["recommended"]}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('Final parsed_assets count: %d', len(parsed_assets))
+        for i, a in enumerate(parsed_assets):
+            logger.debug('  [%d] %s -> type=%s, recommended=%s', i, a['name'], a['type'], a['recommended'])
     
     return parsed_assets
 
@@ -214,16 +551,13 @@ def format_update_message(latest_info: Dict) -> str:
     """
     version = latest_info.get('tag_name', '未知版本')
     name = latest_info.get('name', '')
-    body = latest_info.get('body', '')
+    raw_body = latest_info.get('body') or ''
     url = latest_info.get('html_url', '')
     
-    # 提取body中的关键信息(前300字符)
-    if body:
-        # 移除markdown格式
-        body = re.sub(r'[#*`]', '', body)
-        body = body.strip()[:300]
-        if len(latest_info.get('body', '')) > 300:
-            body += '...'
+    # 提取body中的关键信息(前300字符)，先截取再移除markdown格式，避免处理完整的更新日志
+    body = raw_body[:300].translate(_MD_STRIP).strip()
+    if body and len(raw_body) > 300:
+        body += '...'
     
     message = t("up_auto_update_msg", version, name, body if body else '(无更新说明)', url)
     
@@ -242,7 +576,25 @@ def check_and_notify(current_version: str, repo: str, silent: bool = False) -> O
         更新信息字典或None
     """
     result = check_update(current_version, repo)
+    return _notify_result(current_version, result, silent)
+
+async def check_and_notify_async(current_version: str, repo: str, silent: bool = False) -> Optional[Dict]:
+    """
+    check_and_notify 的异步版本，可在事件循环中 await 而不阻塞界面
     
+    Args:
+        current_version: 当前版本号
+        repo: GitHub仓库名
+        silent: 是否静默模式(不打印)
+    
+    Returns:
+        更新信息字典或None
+    """
+    result = await check_update_async(current_version, repo)
+    return _notify_result(current_version, result, silent)
+
+def _notify_result(current_version: str, result: Optional[Tuple[bool, Dict]], silent: bool) -> Optional[Dict]:
+    """根据检查结果打印提示并生成更新信息字典"""
     if result is None:
         if not silent:
             print(t("up_check_fail"))
@@ -277,59 +629,24 @@ def check_and_notify(current_version: str, repo: str, silent: bool = False) -> O
             'release_info': latest_info
         }
 
-def apply_windows_update(new_exe_path: str, current_exe_path: str = None) -> bool:
-    """
-    在 Windows 上应用更新：创建批处理脚本来替换当前程序并重启
-    
-    Args:
-        new_exe_path: 新版本 exe 文件路径
-        current_exe_path: 当前程序路径，如果为 None 则自动检测
-    
-    Returns:
-        是否成功启动更新过程
-    """
-    import sys
-    import os
-    import subprocess
-    import tempfile
-    
-    print(f'[DEBUG] apply_windows_update called')
-    print(f'[DEBUG]   new_exe_path: {new_exe_path}')
-    print(f'[DEBUG]   current_exe_path: {current_exe_path}')
-    print(f'[DEBUG]   sys.frozen: {getattr(sys, "frozen", False)}')
-    print(f'[DEBUG]   sys.executable: {sys.executable}')
-    
-    # 检查是否为打包后的 exe
-    if not getattr(sys, 'frozen', False):
-        print('[DEBUG] Not a frozen executable, cannot auto-update')
-        print(t("up_not_frozen"))
-        return False
-    
-    # 获取当前程序路径
-    if current_exe_path is None:
-        current_exe_path = sys.executable
-    print(f'[DEBUG] Final current_exe_path: {current_exe_path}')
-    
-    # 检查新版本文件是否存在
-    if not os.path.exists(new_exe_path):
-        print(f'[DEBUG] New file does not exist!')
-        print(t("up_new_missing", new_exe_path))
-        return False
-    
-    print(f'[DEBUG] New file size: {os.path.getsize(new_exe_path)} bytes')
-    
-    # 获取当前进程 PID
-    pid = os.getpid()
-    
-    # 获取可执行文件名
-    exe_name = os.path.basename(current_exe_path)
 
-    # 获取当前程序所在目录
-    exe_dir = os.path.dirname(current_exe_path)
-    
-    # 创建更新批处理脚本（直接嵌入 PID 避免参数传递问题）
-    # 注意：使用 chcp 65001 解决路径编码问题
-    bat_content = f'''@echo off
+def _write_script(path: str, content: str, mode: int) -> None:
+    """将脚本内容一次性编码并写入文件（覆盖已有文件）"""
+    data = memoryview(content.encode('utf-8'))
+    # Windows 上需要 O_BINARY，否则 CRT 文本模式会再次转换换行符
+    flags = os.O_CREAT | os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, mode)
+    try:
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+    finally:
+        os.close(fd)
+
+
+# Windows 更新批处理脚本模板
+# 注意：使用 chcp 65001 解决路径编码问题
+_WIN_UPDATE_BAT = string.Template('''@echo off
 chcp 65001 >nul
 setlocal enabledelayedexpansion
 
@@ -337,12 +654,12 @@ echo ====================================
 echo FXdownloader - Auto Update
 echo ====================================
 echo.
-echo Waiting for application to exit (PID: {pid})...
+echo Waiting for application to exit (PID: ${pid})...
 
 :: Wait for main process to exit (check every second, max 30 seconds)
 set /a count=0
 :waitloop
-tasklist /FI "PID eq {pid}" 2>nul | find "{pid}" >nul
+tasklist /FI "PID eq ${pid}" 2>nul | find "${pid}" >nul
 if errorlevel 1 goto :process_exited
 set /a count+=1
 if !count! geq 30 goto :force_kill
@@ -351,7 +668,7 @@ goto :waitloop
 
 :force_kill
 echo Process did not exit gracefully, forcing termination...
-taskkill /F /PID {pid} >nul 2>&1
+taskkill /F /PID ${pid} >nul 2>&1
 ping -n 2 127.0.0.1 >nul
 
 :process_exited
@@ -359,7 +676,7 @@ echo Application exited.
 echo.
 
 :: Also kill any remaining instances by name
-taskkill /F /IM "{exe_name}" >nul 2>&1
+taskkill /F /IM "${exe_name}" >nul 2>&1
 
 :: Wait for file handles to be released
 echo Waiting for file locks to release...
@@ -374,14 +691,14 @@ echo.
 set /a retry=0
 :move_retry
 echo Attempt to backup old version...
-del /F /Q "{current_exe_path}.old" >nul 2>&1
-if exist "{current_exe_path}" (
-    move /Y "{current_exe_path}" "{current_exe_path}.old"
+del /F /Q "${current_exe_path}.old" >nul 2>&1
+if exist "${current_exe_path}" (
+    move /Y "${current_exe_path}" "${current_exe_path}.old"
     if errorlevel 1 (
         set /a retry+=1
         if !retry! lss 5 (
             echo Retry !retry!/5 - file still locked, waiting...
-            taskkill /F /IM "{exe_name}" >nul 2>&1
+            taskkill /F /IM "${exe_name}" >nul 2>&1
             ping -n 3 127.0.0.1 >nul
             goto :move_retry
         )
@@ -395,11 +712,11 @@ echo Old version backed up successfully.
 
 :: Copy new exe to original location
 echo Installing new version...
-copy /Y "{new_exe_path}" "{current_exe_path}"
+copy /Y "${new_exe_path}" "${current_exe_path}"
 if errorlevel 1 (
     echo ERROR: Copy failed! Restoring old version...
-    if exist "{current_exe_path}.old" (
-        move /Y "{current_exe_path}.old" "{current_exe_path}"
+    if exist "${current_exe_path}.old" (
+        move /Y "${current_exe_path}.old" "${current_exe_path}"
     )
     pause
     exit /b 1
@@ -408,8 +725,8 @@ echo New version installed successfully.
 
 :: Cleanup
 echo Cleaning up temporary files...
-del /F /Q "{new_exe_path}" >nul 2>&1
-del /F /Q "{current_exe_path}.old" >nul 2>&1
+del /F /Q "${new_exe_path}" >nul 2>&1
+del /F /Q "${current_exe_path}.old" >nul 2>&1
 
 echo.
 echo ====================================
@@ -420,35 +737,35 @@ echo Starting new version in 3 seconds...
 ping -n 4 127.0.0.1 >nul
 
 echo Starting application...
-echo Target: "{current_exe_path}"
-echo Working directory: "{exe_dir}"
+echo Target: "${current_exe_path}"
+echo Working directory: "${exe_dir}"
 
 :: Change to the application directory first
-cd /d "{exe_dir}"
+cd /d "${exe_dir}"
 
 :: Verify the new exe exists before starting
-if not exist "{current_exe_path}" (
-    echo ERROR: New executable not found at "{current_exe_path}"
+if not exist "${current_exe_path}" (
+    echo ERROR: New executable not found at "${current_exe_path}"
     pause
     exit /b 1
 )
 
 :: Start the exe - use pushd/popd to handle paths with spaces
-pushd "{exe_dir}"
+pushd "${exe_dir}"
 echo Current directory: %CD%
 echo Launching executable...
 
 :: Method: Use explorer.exe to launch (most reliable for GUI apps)
-explorer.exe "{current_exe_path}"
+explorer.exe "${current_exe_path}"
 
 :: Wait a moment to let the process start
 ping -n 4 127.0.0.1 >nul
 
 :: Verify the process is running
-tasklist /FI "IMAGENAME eq {exe_name}" 2>nul | find /I "{exe_name}" >nul
+tasklist /FI "IMAGENAME eq ${exe_name}" 2>nul | find /I "${exe_name}" >nul
 if errorlevel 1 (
     echo WARNING: Process may not have started via explorer. Trying cmd...
-    cmd /c start "" "{current_exe_path}"
+    cmd /c start "" "${current_exe_path}"
     ping -n 3 127.0.0.1 >nul
 )
 
@@ -462,18 +779,73 @@ ping -n 6 127.0.0.1 >nul
 :: Delete self (delayed)
 (goto) 2>nul & del /F /Q "%~f0"
 exit /b 0
-'''
+''')
+
+def apply_windows_update(new_exe_path: str, current_exe_path: str = None) -> bool:
+    """
+    在 Windows 上应用更新：创建批处理脚本来替换当前程序并重启
+    
+    Args:
+        new_exe_path: 新版本 exe 文件路径
+        current_exe_path: 当前程序路径，如果为 None 则自动检测
+    
+    Returns:
+        是否成功启动更新过程
+    """
+    logger.debug('apply_windows_update called')
+    logger.debug('  new_exe_path: %s', new_exe_path)
+    logger.debug('  current_exe_path: %s', current_exe_path)
+    logger.debug('  sys.frozen: %s', getattr(sys, 'frozen', False))
+    logger.debug('  sys.executable: %s', sys.executable)
+    
+    # 检查是否为打包后的 exe
+    if not getattr(sys, 'frozen', False):
+        logger.debug('Not a frozen executable, cannot auto-update')
+        print(t("up_not_frozen"))
+        return False
+    
+    # 获取当前程序路径
+    if current_exe_path is None:
+        current_exe_path = sys.executable
+    logger.debug('Final current_exe_path: %s', current_exe_path)
+    
+    # 检查新版本文件是否存在（一次 stat 同时取得文件大小）
+    try:
+        new_exe_stat = os.stat(new_exe_path)
+    except OSError:
+        logger.debug('New file does not exist!')
+        print(t("up_new_missing", new_exe_path))
+        return False
+    
+    logger.debug('New file size: %d bytes', new_exe_stat.st_size)
+    
+    # 获取当前进程 PID
+    pid = os.getpid()
+    
+    # 获取可执行文件名
+    exe_name = os.path.basename(current_exe_path)
+
+    # 获取当前程序所在目录
+    exe_dir = os.path.dirname(current_exe_path)
+    
+    # 创建更新批处理脚本（直接嵌入 PID 避免参数传递问题）
+    bat_content = _WIN_UPDATE_BAT.substitute(
+        pid=pid,
+        exe_name=exe_name,
+        exe_dir=exe_dir,
+        current_exe_path=current_exe_path,
+        new_exe_path=new_exe_path
+    )
     
     # 写入批处理文件
     try:
         bat_path = os.path.join(tempfile.gettempdir(), 'fxdownloader_update.bat')
-        print(f'[DEBUG] Writing update script to: {bat_path}')
+        logger.debug('Writing update script to: %s', bat_path)
         
-        # 使用 utf-8 编码写入，配合 chcp 65001
-        with open(bat_path, 'w', encoding='utf-8') as f:
-            f.write(bat_content)
+        # 使用 utf-8 编码写入，配合 chcp 65001；批处理文件使用 CRLF 换行
+        _write_script(bat_path, bat_content.replace('\n', '\r\n'), 0o600)
         
-        print(f'[DEBUG] Update script written successfully')
+        logger.debug('Update script written successfully')
         
         # 启动批处理脚本（使用新的控制台窗口）
         # 使用 CREATE_NEW_CONSOLE 标志确保脚本在独立窗口运行
@@ -493,54 +865,37 @@ exit /b 0
             close_fds=True
         )
         
-        print(f'[DEBUG] Update script started with PID: {process.pid}')
+        logger.debug('Update script started with PID: %d', process.pid)
         print(t("up_script_started"))
         return True
         
     except Exception as e:
-        import traceback
-        print(f'[DEBUG] Failed to create/start update script:')
-        traceback.print_exc()
+        logger.debug('Failed to create/start update script', exc_info=True)
         print(t("up_create_script_fail", e))
         return False
 
 
-def apply_unix_update(new_binary_path: str, current_binary_path: str = None) -> bool:
-    """
-    在 Linux/macOS 上应用更新：创建 shell 脚本来替换当前程序并重启
-    
-    Args:
-        new_binary_path: 新版本二进制文件路径
-        current_binary_path: 当前程序路径，如果为 None 则自动检测
-    
-    Returns:
-        是否成功启动更新过程
-    """
-    import sys
-    import os
-    import subprocess
-    import tempfile
-    import stat
-    
-    # 检查是否为打包后的程序
-    if not getattr(sys, 'frozen', False):
-        print(t("up_not_frozen_linux"))
-        return False
-    
-    # 获取当前程序路径
-    if current_binary_path is None:
-        current_binary_path = sys.executable
-    
-    # 检查新版本文件是否存在
-    if not os.path.exists(new_binary_path):
-        print(t("up_new_missing_linux", new_binary_path))
-        return False
-    
-    # 获取当前进程 PID
-    pid = os.getpid()
-    
-    # 创建更新 shell 脚本
-    shell_content = f'''#!/bin/bash
+# Linux 终端模拟器及其参数，按优先级排列（{script} 为更新脚本路径）
+_TERMINALS = (
+    ('gnome-terminal', ('--', 'bash', '{script}')),
+    ('konsole', ('-e', 'bash', '{script}')),
+    ('xfce4-terminal', ('-e', 'bash {script}')),
+    ('xterm', ('-e', 'bash', '{script}')),
+    ('termux-open', ('{script}',)),  # Termux
+)
+
+@lru_cache(maxsize=1)
+def _find_terminal() -> Optional[Tuple[str, Tuple[str, ...]]]:
+    """在 PATH 中查找可用的终端模拟器，返回 (可执行文件路径, 参数模板) 或 None"""
+    for name, args in _TERMINALS:
+        path = shutil.which(name)
+        if path:
+            return path, args
+    return None
+
+
+# Linux/macOS 更新 shell 脚本模板
+_UNIX_UPDATE_SH = string.Template('''#!/bin/bash
 echo "===================================="
 echo "FXdownloader - 自动更新"
 echo "===================================="
@@ -548,7 +903,7 @@ echo ""
 echo "正在等待程序退出..."
 
 # 等待原进程退出
-while kill -0 {pid} 2>/dev/null; do
+while kill -0 ${pid} 2>/dev/null; do
     sleep 1
 done
 
@@ -556,11 +911,11 @@ echo "程序已退出，开始更新..."
 echo ""
 
 # 备份旧版本
-BACKUP_PATH="{current_binary_path}.backup"
-if [ -f "{current_binary_path}" ]; then
+BACKUP_PATH="${current_binary_path}.backup"
+if [ -f "${current_binary_path}" ]; then
     echo "备份旧版本..."
-    cp "{current_binary_path}" "$BACKUP_PATH"
-    if [ $? -ne 0 ]; then
+    cp "${current_binary_path}" "$$BACKUP_PATH"
+    if [ $$? -ne 0 ]; then
         echo "备份失败，更新终止"
         read -p "按回车键退出..."
         exit 1
@@ -569,21 +924,21 @@ fi
 
 # 替换新版本
 echo "安装新版本..."
-cp "{new_binary_path}" "{current_binary_path}"
-if [ $? -ne 0 ]; then
+cp "${new_binary_path}" "${current_binary_path}"
+if [ $$? -ne 0 ]; then
     echo "更新失败，正在恢复旧版本..."
-    cp "$BACKUP_PATH" "{current_binary_path}"
+    cp "$$BACKUP_PATH" "${current_binary_path}"
     read -p "按回车键退出..."
     exit 1
 fi
 
 # 设置执行权限
-chmod +x "{current_binary_path}"
+chmod +x "${current_binary_path}"
 
 # 清理
 echo "清理临时文件..."
-rm -f "{new_binary_path}" 2>/dev/null
-rm -f "$BACKUP_PATH" 2>/dev/null
+rm -f "${new_binary_path}" 2>/dev/null
+rm -f "$$BACKUP_PATH" 2>/dev/null
 
 echo ""
 echo "✓ 更新完成！正在启动新版本..."
@@ -591,18 +946,52 @@ echo ""
 sleep 2
 
 # 启动新版本
-nohup "{current_binary_path}" >/dev/null 2>&1 &
+nohup "${current_binary_path}" >/dev/null 2>&1 &
 
 # 删除自身
-rm -f "$0" 2>/dev/null
+rm -f "$$0" 2>/dev/null
 exit 0
-'''
+''')
+
+def apply_unix_update(new_binary_path: str, current_binary_path: str = None) -> bool:
+    """
+    在 Linux/macOS 上应用更新：创建 shell 脚本来替换当前程序并重启
+    
+    Args:
+        new_binary_path: 新版本二进制文件路径
+        current_binary_path: 当前程序路径，如果为 None 则自动检测
+    
+    Returns:
+        是否成功启动更新过程
+    """
+    # 检查是否为打包后的程序
+    if not getattr(sys, 'frozen', False):
+        print(t("up_not_frozen_linux"))
+        return False
+    
+    # 获取当前程序路径
+    if current_binary_path is None:
+        current_binary_path = sys.executable
+    
+    # 检查新版本文件是否存在
+    if not os.path.exists(new_binary_path):
+        print(t("up_new_missing_linux", new_binary_path))
+        return False
+    
+    # 获取当前进程 PID
+    pid = os.getpid()
+    
+    # 创建更新 shell 脚本
+    shell_content = _UNIX_UPDATE_SH.substitute(
+        pid=pid,
+        current_binary_path=current_binary_path,
+        new_binary_path=new_binary_path
+    )
     
     # 写入 shell 脚本
     try:
         script_path = os.path.join(tempfile.gettempdir(), 'fxdownloader_update.sh')
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(shell_content)
+        _write_script(script_path, shell_content, 0o700)
         
         # 设置执行权限
         os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IEXEC)
@@ -615,23 +1004,17 @@ exit 0
                 f'tell application "Terminal" to do script "{script_path}"'
             ])
         else:
-            # Linux: 尝试各种终端模拟器
-            terminals = [
-                ['gnome-terminal', '--', 'bash', script_path],
-                ['konsole', '-e', 'bash', script_path],
-                ['xfce4-terminal', '-e', f'bash {script_path}'],
-                ['xterm', '-e', 'bash', script_path],
-                ['termux-open', script_path],  # Termux
-            ]
-            
+            # Linux: 使用找到的第一个终端模拟器
+            terminal = _find_terminal()
             launched = False
-            for term_cmd in terminals:
+            if terminal:
+                term_path, term_args = terminal
+                term_cmd = [term_path] + [arg.format(script=script_path) for arg in term_args]
                 try:
                     subprocess.Popen(term_cmd, start_new_session=True)
                     launched = True
-                    break
-                except (FileNotFoundError, OSError):
-                    continue
+                except OSError:
+                    pass
             
             if not launched:
                 # 如果没有找到终端，直接后台运行
@@ -656,8 +1039,6 @@ def apply_update(new_file_path: str, current_path: str = None) -> bool:
     Returns:
         是否成功启动更新过程
     """
-    import sys
-    
     if sys.platform == 'win32':
         return apply_windows_update(new_file_path, current_path)
     elif sys.platform in ('linux', 'darwin'):
@@ -669,13 +1050,11 @@ def apply_update(new_file_path: str, current_path: str = None) -> bool:
 
 def get_update_exe_path(save_path: str, filename: str) -> str:
     """获取下载的更新文件完整路径"""
-    import os
     return os.path.join(save_path, filename)
 
 
 def can_auto_update() -> bool:
     """检查当前环境是否支持自动更新"""
-    import sys
     # Windows、Linux、macOS 打包后的程序都支持自动更新
     supported_platforms = ('win32', 'linux', 'darwin')
     return sys.platform in supported_platforms and getattr(sys, 'frozen', False)